@@ -24,3 +24,21 @@ app = FastAPI(
 app.include_router(scheduler_router)
 
 # 여기서 미들웨어, CORS, 이벤트 훅(on_startup 등)을 추가해도 됨
+
+# =======================================
+# 직접 실행 시 uvicorn 구동
+#  - loop="uvloop", http="httptools": C 구현 이벤트루프/파서 사용
+#    (pip install uvloop httptools 필요)
+#  - timeout_keep_alive: 브라우저가 연결을 재사용하도록 keep-alive 유지
+# =======================================
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(
+        "scheduler.main:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="uvloop",
+        http="httptools",
+        timeout_keep_alive=30,
+    )
@@ -19,11 +19,21 @@ class AppState:
     original_df : 업로드된 원본 CSV 데이터
     result_df   : 시간표 자동 배정 결과
     preferred_days : 교수별 선호 요일 설정 (예: {"홍길동": ["월", "수"]})
+    room_stats  : result_df 기준 공실 분석 캐시 (없으면 None)
+    free_slots  : result_df 기준 대여 가능 슬롯 캐시 (없으면 None)
     """
 
     original_df: Optional[pd.DataFrame] = None
     result_df: Optional[pd.DataFrame] = None
     preferred_days: Dict[str, List[str]] = field(default_factory=dict)
+    room_stats: Optional[List[Dict]] = None
+    free_slots: Optional[List[Dict]] = None
+
+    def set_result(self, result_df: Optional[pd.DataFrame]) -> None:
+        """배정 결과 갱신 + 공실 분석 캐시 무효화"""
+        self.result_df = result_df
+        self.room_stats = None
+        self.free_slots = None
 
 
 # =======================================
@@ -1,328 +1,469 @@
-"""
-service.py
-
-- 비즈니스 로직 모듈
-- 주요 기능:
-  1) assign_timetable : CSV → 강의실/시간 자동 배정
-  2) compute_vacancy_stats : 배정 결과 → 공실/대여 가능 시간 계산
-  3) generate_ics_from_free_slots : 대여 가능 시간을 ICS 문자열로 변환
-"""
-
-from typing import Dict, List, Tuple
-import pandas as pd
-import random
-import re
-from datetime import datetime, timedelta
-
-
-# =======================================
-# 기본 설정값 (강의실 / 요일 / 시간블록)
-# =======================================
-ROOMS_MAIN = ["1215", "1216", "1217", "1418"]   # 기본 강의실 목록
-EXTRA_ROOM_NAME = "외부강의실1"                 # 필요 시 추가로 사용하는 외부 강의실
-
-DAYS = ["월", "화", "수", "목", "금"]            # 수업 요일
-
-# 3교시씩 묶인 시간 블록
-# 예: (1,3) → 1~3교시, (4,6) → 4~6교시
-BLOCKS: List[Tuple[int, int]] = [
-    (1, 3),   # 1~3교시
-    (4, 6),   # 4~6교시
-    (7, 9),   # 7~9교시
-]
-
-
-# =====================================================
-# 1. 시간표 자동 배정
-# =====================================================
-def assign_timetable(
-    df: pd.DataFrame,
-    preferred_day_dict: Dict[str, List[str]],
-) -> pd.DataFrame:
-    """
-    CSV DataFrame을 입력받아 자동으로 시간표(배정 결과 DataFrame)를 생성
-
-    - 실습/이론 분리 후 실습을 먼저 배정
-    - 교수 선호 요일(웹 + CSV) 반영
-    - 강의실/교수 중복을 방지하며 (요일 → 강의실 → 시간블록) 순서로 배정
-    """
-    rooms = ROOMS_MAIN.copy()
-    schedule = {}        # (day, period, room) -> (subj, prof)
-    prof_schedule = {}   # (prof, day, period) -> True (교수 스케줄 중복 방지)
-    assigned_rows = []
-
-    # ---------------------------------------
-    # 1) 실습/이론 과목 분리 후 순서 섞기
-    # ---------------------------------------
-    if "강의유형구분" in df.columns:
-        # "실습"인 과목 우선 배정
-        pr_mask = df["강의유형구분"].astype(str).str.strip() == "실습"
-        df_prac = df[pr_mask].sample(frac=1)
-        df_theo = df[~pr_mask].sample(frac=1)
-        df_sorted = pd.concat([df_prac, df_theo]).reset_index(drop=True)
-    else:
-        df_sorted = df.sample(frac=1).reset_index(drop=True)
-
-    # ---------------------------------------
-    # 2) 각 과목을 한 개씩 배정 시도
-    # ---------------------------------------
-    for _, row in df_sorted.iterrows():
-        subj = str(row.get("교과목명", "")).strip()
-        prof = str(row.get("강좌담당교수", row.get("강좌대표교수", ""))).strip()
-
-        # ---------------------------
-        # (a) 실습 여부 판단
-        # ---------------------------
-        is_prac = False
-        if "강의유형구분" in df.columns:
-            is_prac = str(row["강의유형구분"]).strip() == "실습"
-
-        # 실습이면 실습실 우선, 아니면 일반 강의실 우선
-        if is_prac:
-            preferred_rooms = ["1216", "1217"]  # 실습실
-        else:
-            preferred_rooms = ["1215", "1418"]  # 이론 강의실
-
-        other_rooms = [r for r in rooms if r not in preferred_rooms]
-        room_order = preferred_rooms + other_rooms
-
-        # ---------------------------
-        # (b) 교수 선호요일 결정
-        #     1순위: 웹에서 설정한 값(state.preferred_days)
-        #     2순위: CSV의 '선호요일' 컬럼
-        # ---------------------------
-        gui_pref = preferred_day_dict.get(prof, None)
-        if gui_pref:
-            preferred_days = gui_pref[:]
-        else:
-            preferred_days = []
-            if "선호요일" in df.columns:
-                raw = str(row.get("선호요일", "")).strip()
-                if raw:
-                    tokens = re.split(r"[,\s/]+", raw)
-                    preferred_days = [t for t in tokens if t in DAYS]
-
-        # 요일 우선순위 리스트 생성
-        if preferred_days:
-            pref = preferred_days[:]
-            random.shuffle(pref)
-            other = [d for d in DAYS if d not in preferred_days]
-            random.shuffle(other)
-            day_order_list = pref + other
-        else:
-            day_order_list = DAYS[:]
-            random.shuffle(day_order_list)
-
-        placed = False  # 배정 성공 여부
-
-        # 외부강의실을 rooms 및 room_order에 포함
-        if EXTRA_ROOM_NAME not in rooms:
-            rooms.append(EXTRA_ROOM_NAME)
-        if EXTRA_ROOM_NAME not in room_order:
-            room_order.append(EXTRA_ROOM_NAME)
-
-        # ---------------------------------------
-        # 3) (요일 → 강의실 → 시간블록) 순으로 빈자리 탐색
-        # ---------------------------------------
-        for day in day_order_list:
-            if placed:
-                break
-
-            room_list = room_order[:]
-            random.shuffle(room_list)
-
-            for room in room_list:
-                if placed:
-                    break
-
-                blocks_random = BLOCKS[:]
-                random.shuffle(blocks_random)
-
-                for (start, end) in blocks_random:
-                    periods = list(range(start, end + 1))
-                    conflict = False
-
-                    # ---------------------------
-                    # (1) 강의실/교수 중복 체크
-                    # ---------------------------
-                    for p in periods:
-                        # 강의실 중복
-                        if (day, p, room) in schedule:
-                            conflict = True
-                            break
-                        # 교수 스케줄 중복
-                        if (prof, day, p) in prof_schedule:
-                            conflict = True
-                            break
-
-                    if conflict:
-                        continue
-
-                    # ---------------------------
-                    # (2) 해당 블록에 실제 배정
-                    # ---------------------------
-                    for p in periods:
-                        schedule[(day, p, room)] = (subj, prof)
-                        prof_schedule[(prof, day, p)] = True
-
-                    assigned_rows.append([subj, prof, day, start, end, room])
-                    placed = True
-                    break
-
-        # ---------------------------------------
-        # 4) 어떠한 블록에도 배정되지 못한 경우
-        # ---------------------------------------
-        if not placed:
-            print(f"[WARN] '{subj}' 과목 배정 불가 (공간/조건 부족)")
-
-    # ---------------------------------------
-    # 5) 결과 DataFrame 생성 및 정렬
-    # ---------------------------------------
-    result_df = pd.DataFrame(
-        assigned_rows,
-        columns=["교과목명", "담당교수", "요일", "시작교시", "종료교시", "배정강의실"],
-    )
-
-    if result_df.empty:
-        return result_df
-
-    # 요일 → 강의실 → 시작교시 순으로 정렬
-    day_map = {d: i for i, d in enumerate(DAYS)}
-    room_map = {r: i for i, r in enumerate(ROOMS_MAIN + [EXTRA_ROOM_NAME])}
-
-    result_df["d_order"] = result_df["요일"].map(day_map)
-    result_df["r_order"] = result_df["배정강의실"].map(room_map)
-
-    result_df = result_df.sort_values(
-        by=["d_order", "r_order", "시작교시"]
-    ).drop(columns=["d_order", "r_order"])
-
-    return result_df
-
-
-# =====================================================
-# 2. 공실 분석 및 대여 가능한 슬롯 계산
-# =====================================================
-def compute_vacancy_stats(result_df: pd.DataFrame):
-    """
-    자동 배정 결과(result_df)를 받아:
-
-    - 강의실별 공실률(room_stats)
-    - 요일/강의실/블록 단위의 대여 가능 시간(free_slots)
-
-    을 계산하여 반환
-    """
-    rooms_all = ROOMS_MAIN + [EXTRA_ROOM_NAME]
-
-    # ---------------------------------------
-    # 1) 이미 배정된 블록 수집
-    # ---------------------------------------
-    used_slots = set()
-    for _, row in result_df.iterrows():
-        used_slots.add(
-            (row["요일"], row["배정강의실"], int(row["시작교시"]), int(row["종료교시"]))
-        )
-
-    room_stats = []
-    free_slots = []
-
-    used_counts = result_df["배정강의실"].value_counts().to_dict()
-    total_slots_per_room = len(DAYS) * len(BLOCKS)
-
-    # ---------------------------------------
-    # 2) 강의실별 공실률 계산
-    # ---------------------------------------
-    for room in rooms_all:
-        used = used_counts.get(room, 0)
-        free = total_slots_per_room - used
-        free_rate = (free / total_slots_per_room * 100.0) if total_slots_per_room > 0 else 0.0
-
-        room_stats.append(
-            {
-                "room": room,
-                "total": total_slots_per_room,
-                "used": used,
-                "free": free,
-                "free_rate": free_rate,
-            }
-        )
-
-    # ---------------------------------------
-    # 3) 대여 가능 슬롯 리스트 생성
-    #    (요일, 강의실, 시간블록 단위)
-    # ---------------------------------------
-    for day in DAYS:
-        for room in rooms_all:
-            for (start, end) in BLOCKS:
-                key = (day, room, start, end)
-                if key not in used_slots:
-                    free_slots.append(
-                        {"day": day, "room": room, "start": start, "end": end}
-                    )
-
-    return room_stats, free_slots
-
-
-# =====================================================
-# 3. ICS 생성 (Google Calendar용)
-# =====================================================
-def generate_ics_from_free_slots(
-    free_slots: List[Dict],
-    base_monday: str = "2025-03-03",
-) -> Tuple[str, str]:
-    """
-    대여 가능 슬롯(free_slots)을 기반으로 Google Calendar용 ICS 문자열과
-    저장 파일명(filename)을 생성해서 반환.
-
-    base_monday : 기준이 되는 "월요일" 날짜 (YYYY-MM-DD 형식)
-    """
-    # 1) 기준 월요일 날짜 파싱
-    try:
-        base_date = datetime.strptime(base_monday, "%Y-%m-%d")
-    except ValueError:
-        # 형식이 잘못된 경우 호출 측에서 HTTPException 처리
-        raise ValueError("base_monday 형식은 YYYY-MM-DD 이어야 합니다.")
-
-    weekday_map = {"월": 0, "화": 1, "수": 2, "목": 3, "금": 4}
-
-    lines = []
-    lines.append("BEGIN:VCALENDAR")
-    lines.append("VERSION:2.0")
-    lines.append("PRODID:-//ClassRoom Scheduler//KO")
-
-    # 2) 각 슬롯을 VEVENT로 변환
-    for i, slot in enumerate(free_slots):
-        day = slot["day"]
-        room = slot["room"]
-        start_p = int(slot["start"])
-        end_p = int(slot["end"])
-
-        if day not in weekday_map:
-            continue
-
-        day_offset = weekday_map[day]
-        date = base_date + timedelta(days=day_offset)
-
-        # 1교시 = 9시, 2교시 = 10시 ... 으로 가정
-        start_hour = 8 + start_p   # 1→9시, 4→12시
-        end_hour = 9 + end_p       # 3→12시, 6→15시, 9→18시
-
-        dt_start = date.replace(hour=start_hour, minute=0, second=0)
-        dt_end = date.replace(hour=end_hour, minute=0, second=0)
-
-        dt_start_str = dt_start.strftime("%Y%m%dT%H%M%S")
-        dt_end_str = dt_end.strftime("%Y%m%dT%H%M%S")
-        uid = f"{i}-{dt_start_str}-{room}@class-scheduler"
-
-        lines.append("BEGIN:VEVENT")
-        lines.append(f"UID:{uid}")
-        lines.append(f"SUMMARY:[대여가능] {room}")
-        lines.append(f"DTSTART:{dt_start_str}")
-        lines.append(f"DTEND:{dt_end_str}")
-        lines.append("END:VEVENT")
-
-    lines.append("END:VCALENDAR")
-
-    ics_content = "\r\n".join(lines)
-    filename = f"free_slots_{base_monday}.ics"
-    return ics_content, filename
+"""
+service.py
+
+- 비즈니스 로직 모듈
+- 주요 기능:
+  1) assign_timetable : CSV → 강의실/시간 자동 배정
+  2) compute_vacancy_stats : 배정 결과 → 공실/대여 가능 시간 계산
+  3) generate_ics_from_free_slots : 대여 가능 시간을 ICS 바이트 스트림으로 변환
+"""
+
+from functools import lru_cache
+from typing import Dict, Iterator, List, Tuple
+import itertools
+import numpy as np
+import pandas as pd
+import re
+from datetime import datetime, timedelta
+
+
+# =======================================
+# 기본 설정값 (강의실 / 요일 / 시간블록)
+# =======================================
+ROOMS_MAIN = ["1215", "1216", "1217", "1418"]   # 기본 강의실 목록
+EXTRA_ROOM_NAME = "외부강의실1"                 # 필요 시 추가로 사용하는 외부 강의실
+
+DAYS = ["월", "화", "수", "목", "금"]            # 수업 요일
+_DAYS_SET = frozenset(DAYS)                     # 요일 멤버십 검사용
+
+# '선호요일' 컬럼 토큰 구분자 (쉼표/공백/슬래시)
+_PREF_RE = re.compile(r"[,\s/]+")
+
+# 3교시씩 묶인 시간 블록
+# 예: (1,3) → 1~3교시, (4,6) → 4~6교시
+BLOCKS: List[Tuple[int, int]] = [
+    (1, 3),   # 1~3교시
+    (4, 6),   # 4~6교시
+    (7, 9),   # 7~9교시
+]
+
+N_PERIODS = 9   # 하루 최대 교시 수 (1~9교시)
+
+# 블록 id 별 교시 구간 비트마스크 (비트 p = p교시)
+_BLOCK_MASKS = np.array(
+    [(1 << (e + 1)) - (1 << s) for (s, e) in BLOCKS], dtype=np.uint16
+)
+
+
+# BLOCKS 의 가능한 순서 전체 (3! = 6가지)
+# 후보마다 리스트 복사 + shuffle 하지 않고 난수 인덱스로 골라 씀
+@lru_cache(maxsize=None)
+def _block_permutations() -> np.ndarray:
+    """블록 id 순열 테이블, shape (6, 3) (최초 호출 시 한 번만 계산)"""
+    return np.array(list(itertools.permutations(range(len(BLOCKS)))), dtype=np.int64)
+
+
+def _search_slot(occ_bits, prof_day_bits, day_order, room_order, perm_ids, perm_table, block_masks):
+    """
+    (요일 → 강의실 → 블록) 순으로 첫 빈 슬롯을 찾아 비트맵을 갱신
+
+    - 순수 정수/배열 연산만 사용하는 커널 (numba 설치 시 JIT 컴파일됨)
+    - 반환: (요일 idx, 강의실 idx, 블록 idx), 배정 불가 시 (-1, -1, -1)
+    """
+    n_rooms = room_order.shape[0]
+    for di in range(day_order.shape[0]):
+        d = day_order[di]
+        for ri in range(n_rooms):
+            r = room_order[ri]
+            perm = perm_table[perm_ids[di * n_rooms + ri]]
+            for k in range(perm.shape[0]):
+                b = perm[k]
+                mask = block_masks[b]
+                if ((occ_bits[d, r] | prof_day_bits[d]) & mask) == 0:
+                    occ_bits[d, r] |= mask
+                    prof_day_bits[d] |= mask
+                    return d, r, b
+    return -1, -1, -1
+
+
+# numba 가 설치되어 있으면 탐색 커널을 JIT 컴파일 (없으면 순수 파이썬으로 동작)
+try:
+    from numba import njit
+
+    _search_slot = njit(cache=True)(_search_slot)
+except ImportError:
+    pass
+
+
+@lru_cache(maxsize=None)
+def _room_order(is_prac: bool) -> Tuple[str, ...]:
+    """
+    실습 여부에 따른 강의실 우선순위 순서
+
+    - 실습: 실습실(1216/1217) 우선, 이론: 이론 강의실(1215/1418) 우선
+    - 외부강의실은 항상 마지막 순위
+    - 입력이 bool 두 가지뿐이라 lru_cache 로 리스트 재구성을 제거
+    """
+    preferred = ("1216", "1217") if is_prac else ("1215", "1418")
+    rooms_all = ROOMS_MAIN + [EXTRA_ROOM_NAME]
+    return preferred + tuple(r for r in rooms_all if r not in preferred)
+
+# 모듈 공용 난수 생성기 (호출마다 OS 엔트로피로 재시드하지 않도록 재사용)
+_RNG = np.random.default_rng()
+
+
+# 스케줄링에 쓰이는 문자열 컬럼 (업로드 시 한 번에 정규화)
+_TEXT_COLUMNS = ["교과목명", "강좌담당교수", "강좌대표교수", "강의유형구분", "선호요일"]
+
+
+def normalize_timetable_df(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    업로드 직후 호출되는 정규화 함수
+
+    - 스케줄링에 쓰이는 문자열 컬럼의 결측치를 "" 로 채우고 공백 제거
+    - 배정 루프에서 행마다 str()/strip() 을 반복하지 않도록 미리 처리
+    """
+    for col in _TEXT_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].fillna("").astype(str).str.strip()
+    return df
+
+
+# =====================================================
+# 0. 결과 캐시
+#    - 같은 CSV + 같은 선호요일 설정이면 배정을 다시 돌리지 않음
+#    - 공실 분석도 같은 배정 결과에 대해 재계산하지 않음
+# =====================================================
+_CACHE_MAX = 8  # 캐시 최대 보관 개수 (초과 시 가장 오래된 항목 제거)
+
+_assign_cache: Dict[Tuple, pd.DataFrame] = {}
+_vacancy_cache: Dict[int, Tuple[list, list]] = {}
+
+
+def _df_hash(df: pd.DataFrame) -> int:
+    """DataFrame 내용 기반 해시 (캐시 키용)"""
+    return int(pd.util.hash_pandas_object(df, index=False).sum())
+
+
+def _cache_put(cache: Dict, key, value) -> None:
+    """캐시에 저장하되 _CACHE_MAX 개를 넘으면 가장 오래된 항목 제거"""
+    if len(cache) >= _CACHE_MAX:
+        cache.pop(next(iter(cache)))
+    cache[key] = value
+
+
+# =====================================================
+# 1. 시간표 자동 배정
+# =====================================================
+def assign_timetable(
+    df: pd.DataFrame,
+    preferred_day_dict: Dict[str, List[str]],
+) -> pd.DataFrame:
+    """
+    CSV DataFrame을 입력받아 자동으로 시간표(배정 결과 DataFrame)를 생성
+
+    - 실습/이론 분리 후 실습을 먼저 배정
+    - 교수 선호 요일(웹 + CSV) 반영
+    - 강의실/교수 중복을 방지하며 (요일 → 강의실 → 시간블록) 순서로 배정
+    - 같은 (CSV, 선호요일) 입력은 캐시된 결과를 재사용
+    """
+    # ---------------------------------------
+    # 0) 캐시 조회: (CSV 해시, 선호요일 설정) 키
+    # ---------------------------------------
+    cache_key = (
+        _df_hash(df),
+        tuple(sorted((p, tuple(days)) for p, days in preferred_day_dict.items())),
+    )
+    cached = _assign_cache.get(cache_key)
+    if cached is not None:
+        return cached.copy()
+
+    rooms_all = ROOMS_MAIN + [EXTRA_ROOM_NAME]
+    day_idx = {d: i for i, d in enumerate(DAYS)}
+    room_idx = {r: i for i, r in enumerate(rooms_all)}
+
+    # 점유 비트맵 (교시별 불리언 배열 대신 요일×강의실 당 uint16 하나)
+    #  - occ_bits[요일, 강의실]  : 비트 p = p교시 점유 여부
+    #  - prof_bits[교수, 요일]   : 비트 p = 교수의 p교시 점유 여부
+    occ_bits = np.zeros((len(DAYS), len(rooms_all)), dtype=np.uint16)
+    prof_bits = np.zeros((len(df), len(DAYS)), dtype=np.uint16)
+    prof_idx: Dict[str, int] = {}  # 교수명 -> prof_bits 행 번호 (처음 등장 시 부여)
+
+    assigned_rows = []
+    perm_table = _block_permutations()
+
+    # ---------------------------------------
+    # 1) 실습/이론 과목 분리 후 순서 섞기
+    #    (sample(frac=1) 대신 인덱스 순열 한 번으로 처리)
+    # ---------------------------------------
+    if "강의유형구분" in df.columns:
+        # "실습"인 과목 우선 배정
+        pr_mask = (df["강의유형구분"].astype(str).str.strip() == "실습").to_numpy()
+        idx_prac = _RNG.permutation(np.flatnonzero(pr_mask))
+        idx_theo = _RNG.permutation(np.flatnonzero(~pr_mask))
+        order = np.concatenate([idx_prac, idx_theo])
+        df_sorted = df.iloc[order].reset_index(drop=True)
+        prac_flags = pr_mask[order]
+    else:
+        df_sorted = df.iloc[_RNG.permutation(len(df))].reset_index(drop=True)
+        prac_flags = np.zeros(len(df), dtype=bool)
+
+    # ---------------------------------------
+    # 2) 행마다 str()/strip() 하지 않도록 컬럼 단위로 한 번에 추출
+    #    (업로드 시 normalize_timetable_df 로 이미 정규화되어 있음)
+    # ---------------------------------------
+    n = len(df_sorted)
+    if "교과목명" in df_sorted.columns:
+        subjs = df_sorted["교과목명"].fillna("").astype(str).str.strip().tolist()
+    else:
+        subjs = [""] * n
+
+    if "강좌담당교수" in df_sorted.columns:
+        profs = df_sorted["강좌담당교수"].fillna("").astype(str).str.strip().tolist()
+    elif "강좌대표교수" in df_sorted.columns:
+        profs = df_sorted["강좌대표교수"].fillna("").astype(str).str.strip().tolist()
+    else:
+        profs = [""] * n
+
+    # ---------------------------------------
+    # 3) '선호요일' 컬럼을 루프 밖에서 한 번에 토큰화
+    #    (행마다 re.split 을 호출하지 않도록)
+    # ---------------------------------------
+    if "선호요일" in df_sorted.columns:
+        pref_lists = df_sorted["선호요일"].fillna("").map(
+            lambda s: [t for t in _PREF_RE.split(str(s).strip()) if t in _DAYS_SET]
+        ).tolist()
+    else:
+        pref_lists = None
+
+    # ---------------------------------------
+    # 4) 각 과목을 한 개씩 배정 시도
+    # ---------------------------------------
+    for i in range(n):
+        subj = subjs[i]
+        prof = profs[i]
+        pi = prof_idx.setdefault(prof, len(prof_idx))
+
+        # ---------------------------
+        # (a) 실습 여부 (섞인 순서에 맞춰 미리 계산됨)
+        # ---------------------------
+        is_prac = bool(prac_flags[i])
+
+        # ---------------------------
+        # (b) 교수 선호요일 결정
+        #     1순위: 웹에서 설정한 값(state.preferred_days)
+        #     2순위: CSV의 '선호요일' 컬럼
+        # ---------------------------
+        gui_pref = preferred_day_dict.get(prof, None)
+        if gui_pref:
+            preferred_days = gui_pref[:]
+        else:
+            preferred_days = pref_lists[i] if pref_lists is not None else []
+
+        # 요일 우선순위 리스트 생성
+        if preferred_days:
+            pref = preferred_days[:]
+            _RNG.shuffle(pref)
+            other = [d for d in DAYS if d not in preferred_days]
+            _RNG.shuffle(other)
+            day_order_list = pref + other
+        else:
+            day_order_list = DAYS[:]
+            _RNG.shuffle(day_order_list)
+
+        # 강의실 순서는 행마다 한 번만 섞고,
+        # (요일, 강의실) 후보별 블록 순서는 순열 인덱스를 한 번에 뽑아 둠
+        room_list = list(_room_order(is_prac))
+        _RNG.shuffle(room_list)
+        day_order = np.array([day_idx[day] for day in day_order_list], dtype=np.int64)
+        room_order = np.array([room_idx[room] for room in room_list], dtype=np.int64)
+        perm_ids = _RNG.integers(0, len(perm_table), size=day_order.size * room_order.size)
+
+        # ---------------------------------------
+        # 5) (요일 → 강의실 → 시간블록) 순으로 빈자리 탐색
+        #    정수 연산 커널이 비트맵 갱신까지 수행
+        # ---------------------------------------
+        d, r, b = _search_slot(
+            occ_bits, prof_bits[pi], day_order, room_order, perm_ids, perm_table, _BLOCK_MASKS
+        )
+
+        if d >= 0:
+            start, end = BLOCKS[b]
+            # 정렬 키(d, r)를 미리 같이 담아 둠
+            assigned_rows.append([subj, prof, DAYS[d], start, end, rooms_all[r], int(d), int(r)])
+        else:
+            # ---------------------------------------
+            # 6) 어떠한 블록에도 배정되지 못한 경우
+            # ---------------------------------------
+            print(f"[WARN] '{subj}' 과목 배정 불가 (공간/조건 부족)")
+
+    # ---------------------------------------
+    # 7) 결과 DataFrame 생성 및 정렬
+    #    (요일 → 강의실 → 시작교시 순, lexsort 는 키를 역순으로 받음)
+    # ---------------------------------------
+    columns = ["교과목명", "담당교수", "요일", "시작교시", "종료교시", "배정강의실"]
+    if not assigned_rows:
+        result_df = pd.DataFrame(columns=columns)
+    else:
+        arr = np.array(assigned_rows, dtype=object)
+        order = np.lexsort(
+            (arr[:, 3].astype(np.int64), arr[:, 7].astype(np.int64), arr[:, 6].astype(np.int64))
+        )
+        arr = arr[order]
+
+        result_df = pd.DataFrame(
+            {
+                "교과목명": arr[:, 0],
+                "담당교수": arr[:, 1],
+                "요일": arr[:, 2],
+                "시작교시": arr[:, 3].astype(np.int64),
+                "종료교시": arr[:, 4].astype(np.int64),
+                "배정강의실": arr[:, 5],
+            }
+        )
+
+    _cache_put(_assign_cache, cache_key, result_df)
+    return result_df.copy()
+
+
+# =====================================================
+# 2. 공실 분석 및 대여 가능한 슬롯 계산
+# =====================================================
+def compute_vacancy_stats(result_df: pd.DataFrame):
+    """
+    자동 배정 결과(result_df)를 받아:
+
+    - 강의실별 공실률(room_stats)
+    - 요일/강의실/블록 단위의 대여 가능 시간(free_slots)
+
+    을 계산하여 반환 (같은 배정 결과에 대해서는 캐시 재사용)
+    """
+    cache_key = _df_hash(result_df)
+    cached = _vacancy_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    rooms_all = ROOMS_MAIN + [EXTRA_ROOM_NAME]
+
+    # ---------------------------------------
+    # 1) 이미 배정된 블록 수집 (컬럼 단위로 한 번에)
+    # ---------------------------------------
+    used_slots = set(
+        zip(
+            result_df["요일"].tolist(),
+            result_df["배정강의실"].tolist(),
+            result_df["시작교시"].astype(int).tolist(),
+            result_df["종료교시"].astype(int).tolist(),
+        )
+    )
+
+    room_stats = []
+    free_slots = []
+
+    used_counts = result_df["배정강의실"].value_counts().to_dict()
+    total_slots_per_room = len(DAYS) * len(BLOCKS)
+
+    # ---------------------------------------
+    # 2) 강의실별 공실률 계산
+    # ---------------------------------------
+    for room in rooms_all:
+        used = used_counts.get(room, 0)
+        free = total_slots_per_room - used
+        free_rate = (free / total_slots_per_room * 100.0) if total_slots_per_room > 0 else 0.0
+
+        room_stats.append(
+            {
+                "room": room,
+                "total": total_slots_per_room,
+                "used": used,
+                "free": free,
+                "free_rate": free_rate,
+            }
+        )
+
+    # ---------------------------------------
+    # 3) 대여 가능 슬롯 리스트 생성
+    #    (요일, 강의실, 시간블록 단위)
+    # ---------------------------------------
+    for day in DAYS:
+        for room in rooms_all:
+            for (start, end) in BLOCKS:
+                key = (day, room, start, end)
+                if key not in used_slots:
+                    free_slots.append(
+                        {"day": day, "room": room, "start": start, "end": end}
+                    )
+
+    _cache_put(_vacancy_cache, cache_key, (room_stats, free_slots))
+    return room_stats, free_slots
+
+
+# =====================================================
+# 3. ICS 생성 (Google Calendar용)
+# =====================================================
+# 한 번에 내보내는 VEVENT 개수 (스트리밍 청크 크기)
+_ICS_CHUNK_EVENTS = 100
+
+
+def generate_ics_from_free_slots(
+    free_slots: List[Dict],
+    base_monday: str = "2025-03-03",
+) -> Tuple[Iterator[bytes], str]:
+    """
+    대여 가능 슬롯(free_slots)을 기반으로 Google Calendar용 ICS 바이트를
+    청크 단위로 내보내는 제너레이터와 저장 파일명(filename)을 반환.
+
+    - 전체 문자열을 한 번에 만들지 않고 StreamingResponse 에 바로 물릴 수 있음
+    - base_monday : 기준이 되는 "월요일" 날짜 (YYYY-MM-DD 형식)
+    """
+    # 1) 기준 월요일 날짜 파싱 (스트리밍 시작 전에 검증)
+    try:
+        base_date = datetime.strptime(base_monday, "%Y-%m-%d")
+    except ValueError:
+        # 형식이 잘못된 경우 호출 측에서 HTTPException 처리
+        raise ValueError("base_monday 형식은 YYYY-MM-DD 이어야 합니다.")
+
+    weekday_map = {"월": 0, "화": 1, "수": 2, "목": 3, "금": 4}
+
+    # 요일별 날짜 / 시각별 접미사 문자열을 미리 포맷
+    # (슬롯마다 datetime.replace + strftime 을 두 번씩 호출하지 않도록)
+    date_strs = {
+        day: (base_date + timedelta(days=offset)).strftime("%Y%m%d")
+        for day, offset in weekday_map.items()
+    }
+    hour_strs = [f"T{h:02d}0000" for h in range(24)]
+
+    def _iter_ics() -> Iterator[bytes]:
+        lines = []
+        lines.append("BEGIN:VCALENDAR")
+        lines.append("VERSION:2.0")
+        lines.append("PRODID:-//ClassRoom Scheduler//KO")
+
+        # 2) 각 슬롯을 VEVENT로 변환하며 일정 개수마다 청크로 내보냄
+        events_in_chunk = 0
+        for i, slot in enumerate(free_slots):
+            day = slot["day"]
+            room = slot["room"]
+            start_p = int(slot["start"])
+            end_p = int(slot["end"])
+
+            if day not in weekday_map:
+                continue
+
+            # 1교시 = 9시, 2교시 = 10시 ... 으로 가정
+            start_hour = 8 + start_p   # 1→9시, 4→12시
+            end_hour = 9 + end_p       # 3→12시, 6→15시, 9→18시
+
+            date_str = date_strs[day]
+            dt_start_str = date_str + hour_strs[start_hour]
+            dt_end_str = date_str + hour_strs[end_hour]
+            uid = f"{i}-{dt_start_str}-{room}@class-scheduler"
+
+            lines.append("BEGIN:VEVENT")
+            lines.append(f"UID:{uid}")
+            lines.append(f"SUMMARY:[대여가능] {room}")
+            lines.append(f"DTSTART:{dt_start_str}")
+            lines.append(f"DTEND:{dt_end_str}")
+            lines.append("END:VEVENT")
+
+            events_in_chunk += 1
+            if events_in_chunk >= _ICS_CHUNK_EVENTS:
+                yield ("\r\n".join(lines) + "\r\n").encode("utf-8")
+                lines = []
+                events_in_chunk = 0
+
+        lines.append("END:VCALENDAR")
+        yield "\r\n".join(lines).encode("utf-8")
+
+    filename = f"free_slots_{base_monday}.ics"
+    return _iter_ics(), filename
@@ -0,0 +1,126 @@
+"""
+templates.py
+
+- HTML 화면용 jinja2 템플릿 정의
+- 모듈 import 시점에 한 번만 컴파일되고, 요청마다 render() 만 호출
+  (요청마다 f-string 으로 전체 HTML 을 다시 조립하지 않도록)
+"""
+
+from html import escape
+
+from jinja2 import Template
+
+
+# =======================================
+# HTML 테이블 생성기
+#  - 큰 테이블에서 pandas to_html 보다 빠른 단순 문자열 조립 방식
+# =======================================
+def render_table(columns, rows) -> str:
+    """
+    컬럼명 목록과 행(튜플) 목록을 받아 HTML 테이블 문자열 생성
+
+    - DataFrame.to_html(index=False) 대용 (스타일러/포매터 오버헤드 없음)
+    - 셀 값은 escape 처리
+    """
+    parts = ['<table border="0" class="dataframe">\n<thead><tr>']
+    for col in columns:
+        parts.append(f"<th>{escape(str(col))}</th>")
+    parts.append("</tr></thead>\n<tbody>\n")
+    for row in rows:
+        parts.append("<tr>")
+        for cell in row:
+            parts.append(f"<td>{escape(str(cell))}</td>")
+        parts.append("</tr>\n")
+    parts.append("</tbody>\n</table>")
+    return "".join(parts)
+
+
+# =======================================
+# 메인 페이지
+#  - status_html: 업로드 상태 표시 블록
+# =======================================
+INDEX_TEMPLATE = Template(
+    """
+    <html>
+    <head>
+        <meta charset="utf-8">
+        <title>강의실 자동배정 시스템 (FastAPI)</title>
+    </head>
+    <body>
+        <h1>강의실 자동배정 시스템 (FastAPI)</h1>
+        {{ status_html }}
+
+        <h2>1. CSV 업로드</h2>
+        <form action="/upload-csv" enctype="multipart/form-data" method="post">
+            <input name="file" type="file" />
+            <input type="submit" value="업로드" />
+        </form>
+        <p>※ 업로드 후 자동으로 이 페이지로 돌아옵니다.</p>
+
+        <h2>2. 자동 배정 실행</h2>
+        <form action="/assign-html" method="post">
+            <button type="submit">자동 배정 실행 및 결과 보기</button>
+        </form>
+
+        <h2>3. 공실 분석 / 대여 가능 시간</h2>
+        <a href="/vacancy-html" target="_blank">공실 분석 및 대여 시간 HTML 보기</a><br><br>
+
+        <h3>4. Google Calendar용 ICS 파일 다운로드</h3>
+        <form action="/free-slots-ics" method="get" target="_blank">
+            <label>기준 주의 월요일 날짜 (YYYY-MM-DD): </label>
+            <input type="text" name="base_monday" value="2025-03-03" />
+            <button type="submit">ICS 파일 다운로드</button>
+        </form>
+
+        <hr>
+        <a href="/docs" target="_blank">Swagger API 문서 (/docs)</a>
+    </body>
+    </html>
+    """
+)
+
+
+# =======================================
+# 자동 배정 결과 페이지
+#  - table_html: 배정 결과 테이블 (HTML)
+# =======================================
+ASSIGN_TEMPLATE = Template(
+    """
+    <html>
+    <head><meta charset="utf-8"><title>자동 배정 결과</title></head>
+    <body>
+        <h1>자동 배정 결과</h1>
+        {{ table_html }}
+        <br><a href="/">메인으로 돌아가기</a>
+    </body>
+    </html>
+    """
+)
+
+
+# =======================================
+# 공실 분석 페이지
+#  - room_html / free_html: 공실률·대여 가능 슬롯 테이블 (HTML)
+# =======================================
+VACANCY_TEMPLATE = Template(
+    """
+    <html>
+    <head><meta charset="utf-8"><title>공실 분석 및 대여 가능 시간</title></head>
+    <body>
+        <h1>공실 분석</h1>
+        {{ room_html }}
+        <h1>대여 가능 시간 (슬롯)</h1>
+        {{ free_html }}
+
+        <h3>Google Calendar용 ICS 파일 다운로드</h3>
+        <form action="/free-slots-ics" method="get" target="_blank">
+            <label>기준 주의 월요일 날짜 (YYYY-MM-DD): </label>
+            <input type="text" name="base_monday" value="2025-03-03" />
+            <button type="submit">ICS 파일 다운로드</button>
+        </form>
+
+        <br><a href="/">메인으로 돌아가기</a>
+    </body>
+    </html>
+    """
+)